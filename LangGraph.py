@@ -11,6 +11,7 @@ from agents.CompetitorReportAgent import competitor_agent
 from agents.TechReportAgent import tech_agent
 from agents.InvestmentAgent import investment_analysis_agent, validate_report, increment_retry
 from agents.FinalReportAgent import final_report_agent_with_state
+from agents.StreamingOutput import streaming_enabled, format_ttft_summary
 
 load_dotenv()
 
@@ -51,11 +52,19 @@ builder.add_edge("final", END)
 
 graph = builder.compile()
 
-# 실행하는 부분
-test_state = {
-    "current_index": 0,
-    "investment_summary_retry_count": 0
-}
+# 실행하는 부분 (spawn 방식 워커 프로세스가 이 모듈을 다시 import 해도 그래프가 실행되지 않도록 보호)
+if __name__ == "__main__":
+    test_state = {
+        "current_index": 0,
+        "investment_summary_retry_count": 0
+    }
 
-final_state = graph.invoke(test_state, config={"recursion_limit": 50})
-print(final_state["final_report"]) 
\ No newline at end of file
+    if streaming_enabled():
+        # 노드 이벤트 단위로 진행 상황 출력 (보고서 토큰은 각 노드에서 바로 출력됨)
+        for chunk in graph.stream(test_state, config={"recursion_limit": 50}, stream_mode="updates"):
+            for node in chunk:
+                print(f"▶ [{node}] 완료", flush=True)
+        print(format_ttft_summary())
+    else:
+        final_state = graph.invoke(test_state, config={"recursion_limit": 50})
+        print(final_state["final_report"]) 
\ No newline at end of file
@@ -0,0 +1,15 @@
+import os
+import json
+
+# 로컬 캐시 파일 공용 유틸
+
+
+# JSON 원자적 저장 (임시 파일에 쓴 뒤 교체)
+def write_json_atomic(path: str, data, **dump_kwargs):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp_path, path)
@@ -1,4 +1,5 @@
 from GraphState import GraphState
+from agents.PatentDocuments import count_patents_bulk
 
 STARTUP_LIST = ["업스테이지", "노타AI", "트웰브랩스", "뤼이드", "에어스메디컬"]
 
@@ -7,6 +8,9 @@ STARTUP_LIST = ["업스테이지", "노타AI", "트웰브랩스", "뤼이드", "
 def role_dispatch_agent(state: GraphState) -> GraphState:
     idx = state["current_index"]
     company = STARTUP_LIST[idx]
+    if idx == 0:
+        # 전체 기업의 특허 PDF를 한 번에 프로세스 풀로 카운트해 캐시에 채움 (기업별 평가 시 캐시 적중)
+        count_patents_bulk(STARTUP_LIST)
     return {
         "current_index": idx,
         "current_company": company
@@ -0,0 +1,217 @@
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+import numpy as np
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+# SBERT 대량 임베딩 엔진
+# - workers > 1 이면 sentence-transformers 멀티프로세스 풀로 CPU 코어 전체에 청크를 분산
+# - 결과는 float32 ndarray 그대로 반환 (.tolist() 변환 없이 Chroma에 전달)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "embeddings")
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+# 텍스트 해시 기반 임베딩 캐시
+# - 디스크: float32 행렬(vectors.f32, memmap) + 행 순서대로 기록한 해시 목록(hashes.txt), 모두 append-only
+# - 메모리: LRU 계층 (max_memory_items 개까지)
+# - 파일 잠금이 없으므로 같은 캐시 디렉터리에는 한 프로세스만 기록해야 함
+class EmbeddingCache:
+    def __init__(self, model_name: str, dim: int, cache_dir: str = DEFAULT_CACHE_DIR, max_memory_items: int = 4096):
+        self.dim = dim
+        self.max_memory_items = max_memory_items
+        self.directory = os.path.join(cache_dir, model_name.replace("/", "__"))
+        self.vectors_path = os.path.join(self.directory, "vectors.f32")
+        self.hashes_path = os.path.join(self.directory, "hashes.txt")
+        self._lock = Lock()
+        self._lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self.hits = 0
+        self.misses = 0
+        self.encoded = 0  # SBERT로 실제 인코딩한 고유 텍스트 수
+        self._load()
+
+    def _load(self):
+        os.makedirs(self.directory, exist_ok=True)
+        # 파일이 없으면 0행으로 취급
+        hashes = []
+        if os.path.exists(self.hashes_path):
+            with open(self.hashes_path, encoding="utf-8") as f:
+                hashes = [line.strip() for line in f if line.strip()]
+        vectors_size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        # 기록 도중 중단된 경우 해시 목록과 행렬 중 짧은 쪽에 맞추고, 이후 append가 어긋나지 않도록 두 파일을 잘라냄
+        row_bytes = 4 * self.dim
+        n_rows = min(len(hashes), vectors_size // row_bytes)
+        with open(self.vectors_path, "ab") as f:
+            if vectors_size != n_rows * row_bytes:
+                f.truncate(n_rows * row_bytes)
+        if len(hashes) != n_rows or self._hashes_file_dirty(n_rows):
+            with open(self.hashes_path, "w", encoding="utf-8") as f:
+                f.write("".join(h + "\n" for h in hashes[:n_rows]))
+        self._rows = {h: i for i, h in enumerate(hashes[:n_rows])}
+
+    def _hashes_file_dirty(self, n_rows: int) -> bool:
+        # 파일이 없거나, 마지막 줄이 개행 없이 끊긴 경우 등 행 수와 줄 수가 맞지 않으면 다시 씀
+        if not os.path.exists(self.hashes_path):
+            return True
+        with open(self.hashes_path, "rb") as f:
+            data = f.read()
+        return data.count(b"\n") != n_rows or (bool(data) and not data.endswith(b"\n"))
+
+    def _get_matrix(self) -> Optional[np.memmap]:
+        n_rows = len(self._rows)
+        if n_rows == 0:
+            return None
+        if self._matrix is None or self._matrix.shape[0] != n_rows:
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(n_rows, self.dim))
+        return self._matrix
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_items:
+            self._lru.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self._lru.get(key)
+        if vector is not None:
+            self._lru.move_to_end(key)
+            return vector
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        vector = np.array(self._get_matrix()[row])
+        self._remember(key, vector)
+        return vector
+
+    def _append(self, keys: List[str], vectors: np.ndarray):
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+        with open(self.hashes_path, "a", encoding="utf-8") as f:
+            f.write("".join(k + "\n" for k in keys))
+        start = len(self._rows)
+        for i, key in enumerate(keys):
+            self._rows[key] = start + i
+
+    def encode(self, texts: List[str], encode_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        keys = [text_hash(t) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._lookup(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    out[i] = vector
+            n_missing = sum(len(v) for v in missing.values())
+            self.hits += len(texts) - n_missing
+            self.misses += n_missing
+            self.encoded += len(missing)
+        if missing:
+            # 캐시에 없는 고유 텍스트만 SBERT로 인코딩
+            new_keys = list(missing)
+            new_vectors = np.asarray(encode_fn([texts[missing[k][0]] for k in new_keys]), dtype=np.float32)
+            with self._lock:
+                fresh = [i for i, k in enumerate(new_keys) if k not in self._rows]
+                if fresh:
+                    self._append([new_keys[i] for i in fresh], new_vectors[fresh])
+                for key, vector in zip(new_keys, new_vectors):
+                    self._remember(key, vector)
+                    out[missing[key]] = vector
+        return out
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "encoded": self.encoded,
+                "disk_rows": len(self._rows),
+                "memory_items": len(self._lru),
+            }
+
+
+class BulkEmbedder:
+    def __init__(
+        self,
+        model: "SentenceTransformer",
+        workers: Optional[int] = None,
+        encode_batch_size: int = 64,
+        chunk_size: Optional[int] = None,
+        cache: Optional[EmbeddingCache] = None,
+    ):
+        self.model = model
+        self.cache = cache
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.encode_batch_size = encode_batch_size
+        self.chunk_size = chunk_size
+        self._pool = None
+        self.docs = 0            # 요청된 텍스트 수 (캐시 적중 포함)
+        self.encoded = 0         # SBERT로 실제 인코딩한 텍스트 수
+        self.encode_seconds = 0.0
+
+    def start(self):
+        if self.workers > 1 and self._pool is None:
+            self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+            logger.info(f"SBERT 멀티프로세스 풀 시작 (CPU 워커 {self.workers}개)")
+
+    def stop(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def __enter__(self) -> "BulkEmbedder":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        self.docs += len(texts)
+        if self.cache is not None:
+            return self.cache.encode(texts, self._encode_uncached)
+        return self._encode_uncached(texts)
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        if self._pool is not None:
+            vectors = self.model.encode_multi_process(
+                texts,
+                self._pool,
+                batch_size=self.encode_batch_size,
+                chunk_size=self.chunk_size,
+            )
+        else:
+            vectors = self.model.encode(
+                texts,
+                batch_size=self.encode_batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False,
+            )
+        self.encode_seconds += time.perf_counter() - start
+        self.encoded += len(texts)
+        return np.asarray(vectors, dtype=np.float32)
+
+    # 처리량은 실제 인코딩한 텍스트와 인코딩 시간만으로 계산 (캐시 적중은 따로 표시)
+    def stats(self) -> Dict[str, float]:
+        return {
+            "docs": self.docs,
+            "encoded": self.encoded,
+            "cache_hits": self.docs - self.encoded,
+            "seconds": round(self.encode_seconds, 2),
+            "docs_per_sec": round(self.encoded / self.encode_seconds, 1) if self.encode_seconds else 0.0,
+        }
@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 from langchain_openai import ChatOpenAI
 from GraphState import GraphState
+from agents.StreamingOutput import begin_node, streaming_enabled, stream_completion
 
 load_dotenv()
 
@@ -44,7 +45,7 @@ def save_markdown(text: str, filename: str = "투자_최종_보고서.md", silen
     if not silent:
         print(f"✅ Markdown 파일 저장 완료: {filename}")
 
-def summerize_report(text) -> str:
+def summerize_report(text, sink=None) -> str:
     llm = ChatOpenAI(
         model="gpt-3.5-turbo-0125",  # 또는 "gpt-3.5-turbo"
         temperature=0.3
@@ -65,19 +66,41 @@ def summerize_report(text) -> str:
     {text}
     ------------------------
     """
+    if sink is not None:
+        return stream_completion(llm, prompt, node="final", sink=sink).strip()
     report = llm.invoke(prompt).content.strip()
     return report
 
 def final_report_agent_with_state(state: GraphState, max_retries: int = 3) -> dict:
     max_retries: int = 3
     reports = state.get("reports")
+    if streaming_enabled():
+        return _final_report_streaming(state, reports)
     full_report = ""
     for text in reports:
         company_report = summerize_report(text)
         full_report = full_report + "\n\n" + company_report
 
     for i in range(max_retries):
-        prompt = f"""
+        prompt = overall_review_prompt(full_report)
+        llm = ChatOpenAI(
+            model="gpt-3.5-turbo-0125",  # 또는 "gpt-3.5-turbo"
+            temperature=0.3
+        )
+
+        # 보고서 생성
+        final_report = llm.invoke(prompt).content.strip()
+
+    # 저장은 마지막에만, 메시지도 여기서만 출력
+    save_markdown(full_report + "\n\n" + final_report, silent=False)
+
+    return {
+        **state,
+        "final_report": final_report,
+    }
+
+def overall_review_prompt(full_report: str) -> str:
+    return f"""
     당신은 벤처캐피탈의 투자 분석 보고서 작성 전문가입니다.
 
     아래는 AI 분석 에이전트들이 생성한 평가 결과를 바탕으로 구성된 텍스트입니다.
@@ -90,18 +113,32 @@ def final_report_agent_with_state(state: GraphState, max_retries: int = 3) -> di
     {full_report}
     ------------------------
     """
+
+# 스트리밍 모드: 기업별 섹션을 생성되는 대로 markdown 파일에 이어 쓰고 콘솔에 출력
+def _final_report_streaming(state: GraphState, reports: list,
+                            filename: str = "투자_최종_보고서.md") -> dict:
+    begin_node("final")
+    full_report = ""
+    with open(filename, "w", encoding="utf-8") as f:
+        for text in reports:
+            f.write("\n\n")
+            f.flush()
+            company_report = summerize_report(text, sink=f)
+            full_report = full_report + "\n\n" + company_report
+
         llm = ChatOpenAI(
             model="gpt-3.5-turbo-0125",  # 또는 "gpt-3.5-turbo"
             temperature=0.3
         )
+        prompt = overall_review_prompt(full_report)
+        # 비스트리밍 경로는 같은 프롬프트를 max_retries번 생성해 마지막 결과만 쓰므로, 여기서는 한 번만 생성
+        f.write("\n\n")
+        f.flush()
+        final_report = stream_completion(llm, prompt, node="final", sink=f).strip()
 
-        # 보고서 생성
-        final_report = llm.invoke(prompt).content.strip()
-
-    # 저장은 마지막에만, 메시지도 여기서만 출력
-    save_markdown(full_report + "\n\n" + final_report, silent=False)
+    print(f"✅ Markdown 파일 저장 완료: {filename}")
 
     return {
         **state,
         "final_report": final_report,
-    }
\ No newline at end of file
+    }
@@ -2,6 +2,7 @@ from dotenv import load_dotenv
 from langchain_core.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
 from GraphState import GraphState
+from agents.StreamingOutput import begin_node, streaming_enabled, stream_completion
 
 load_dotenv()
 
@@ -42,6 +43,8 @@ investment_prompt = PromptTemplate.from_template("""
 """)
 
 def investment_analysis_agent(state: GraphState) -> GraphState:
+    if streaming_enabled():
+        begin_node("investment_report")
     prompt = investment_prompt.format(
         tech_report=state["tech_report"],
         competitor_report=state["competitor_report"],
@@ -51,8 +54,12 @@ def investment_analysis_agent(state: GraphState) -> GraphState:
         model="gpt-3.5-turbo-0125",  # 또는 "gpt-3.5-turbo"
         temperature=0.3
     )
-    investment_summary_msg = llm.invoke(prompt)
-    investment_summary = investment_summary_msg.content
+    if streaming_enabled():
+        print(f"\n[{state['current_company']}] 투자 평가 생성 중...", flush=True)
+        investment_summary = stream_completion(llm, prompt, node="investment_report")
+    else:
+        investment_summary_msg = llm.invoke(prompt)
+        investment_summary = investment_summary_msg.content
     report = f"""
     [{state["current_company"]} 보고서]
 
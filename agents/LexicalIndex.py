@@ -0,0 +1,149 @@
+import os
+import re
+import json
+import math
+import logging
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from agents.CacheStore import write_json_atomic
+
+# 특허 청크용 로컬 BM25 역색인 + 벡터 검색 결과와의 RRF 결합
+# - 한글은 음절 bigram, 영문/숫자는 단어 단위로 토큰화 (형태소 분석기 없이 한국어 부분 일치 지원)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.path.join(".cache", "bm25_patents.json")
+TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in TOKEN_PATTERN.findall(text.lower()):
+        if "가" <= word[0] <= "힣" and len(word) > 1:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH, k1: float = 1.5, b: float = 0.75):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.docs: Dict[str, Tuple[str, str, int]] = {}  # doc_id -> (company, text, 토큰 수)
+        self.postings: Dict[str, Dict[str, int]] = {}    # term -> {doc_id: tf}
+        self.total_len = 0
+        self.company_docs: Counter = Counter()  # company -> 문서 수
+        if path and os.path.exists(path):
+            self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"BM25 인덱스 로드 실패 ({self.path}): {e}")
+            return
+        self.docs = {k: tuple(v) for k, v in data["docs"].items()}
+        self.postings = data["postings"]
+        self.total_len = sum(length for _, _, length in self.docs.values())
+        self.company_docs = Counter(company for company, _, _ in self.docs.values())
+
+    def save(self):
+        if not self.path:
+            return
+        write_json_atomic(self.path, {"docs": self.docs, "postings": self.postings}, ensure_ascii=False)
+
+    def add(self, doc_ids: List[str], texts: List[str], company: str):
+        for doc_id, text in zip(doc_ids, texts):
+            # Chroma add와 동일하게 이미 있는 id는 무시
+            if doc_id in self.docs:
+                continue
+            tokens = tokenize(text)
+            self.docs[doc_id] = (company, text, len(tokens))
+            self.total_len += len(tokens)
+            self.company_docs[company] += 1
+            for term, tf in Counter(tokens).items():
+                self.postings.setdefault(term, {})[doc_id] = tf
+
+    # 기업의 기존 청크 제거 (PDF가 바뀌어 다시 적재할 때 이전 청크/id가 남지 않도록)
+    def remove_company(self, company: str) -> int:
+        doc_ids = [doc_id for doc_id, (c, _, _) in self.docs.items() if c == company]
+        for doc_id in doc_ids:
+            _, text, length = self.docs.pop(doc_id)
+            self.total_len -= length
+            for term in set(tokenize(text)):
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.company_docs.pop(company, None)
+        return len(doc_ids)
+
+    def has_company(self, company: str) -> bool:
+        return self.company_docs[company] > 0
+
+    def text(self, doc_id: str) -> str:
+        return self.docs[doc_id][1]
+
+    def search(self, query: str, k: int = 50, company: Optional[str] = None) -> List[Tuple[str, float]]:
+        if not self.docs:
+            return []
+        n_docs = len(self.docs)
+        avg_len = self.total_len / n_docs
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            posting = self.postings.get(term)
+            if not posting:
+                continue
+            idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, tf in posting.items():
+                doc_company, _, length = self.docs[doc_id]
+                if company is not None and doc_company != company:
+                    continue
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)[:k]
+
+
+# Reciprocal Rank Fusion: 여러 순위 목록을 sum(1 / (k + rank))로 결합
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, 1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+
+# 목록별 점수를 min-max 정규화 (최고 1.0, 최저 0.0, 점수가 모두 같으면 1.0)
+def normalize_scores(scored: List[Tuple[str, float]]) -> Dict[str, float]:
+    if not scored:
+        return {}
+    values = [score for _, score in scored]
+    hi, lo = max(values), min(values)
+    if hi == lo:
+        return {doc_id: 1.0 for doc_id, _ in scored}
+    return {doc_id: (score - lo) / (hi - lo) for doc_id, score in scored}
+
+
+# 적응형 컷오프
+# - 순서는 RRF 결과를 따르고, 통과 여부는 원래 점수로 판단
+# - 문서의 관련도 = 각 목록(BM25, 벡터)에서 min-max 정규화한 점수 중 최댓값
+# - 관련도가 cutoff_ratio 이상인 문서만 남기되 [min_results, max_results] 범위로 제한
+#   (소수의 강한 매치 뒤에 긴 꼬리가 있으면 적게, 점수가 고르게 높으면 많이 선택)
+def adaptive_cutoff(
+    fused: List[Tuple[str, float]],
+    relevance: Dict[str, float],
+    cutoff_ratio: float = 0.5,
+    min_results: int = 5,
+    max_results: int = 20,
+) -> List[str]:
+    ordered = [doc_id for doc_id, _ in fused]
+    selected = [doc_id for doc_id in ordered if relevance.get(doc_id, 0.0) >= cutoff_ratio][:max_results]
+    if len(selected) < min_results:
+        extra = [doc_id for doc_id in ordered if doc_id not in selected]
+        selected += extra[:min_results - len(selected)]
+    return selected
@@ -6,6 +6,7 @@ from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Any, TypedDict
 from openai import OpenAI
 from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from requests import get
 
 # (1) GraphState 정의
@@ -92,31 +93,67 @@ class WebRetriever:
                 results.append({"url": url, "snippet": snippet})
         return results
 
-# (8) 콘텐츠 추출기 (병렬)
-class ContentExtractor:
-    def extract_snippets(self, url: str, keywords: List[str]) -> List[str]:
-        snippets = []
+# (8) 페이지 캐시 (실행 단위, URL당 1회 fetch/파싱)
+class PageCache:
+    def __init__(self):
+        self._pages: Dict[str, List[str]] = {}
+        self._lock = Lock()
+        self.requests = 0
+        self.fetches = 0
+
+    def _fetch_paragraphs(self, url: str) -> List[str]:
         try:
             res = get(url, timeout=5)
             res.raise_for_status()
             soup = BeautifulSoup(res.text, "html.parser")
-            for p in soup.find_all("p"):
-                text = p.get_text(strip=True)
-                if any(kw in text for kw in keywords):
-                    snippets.append(text)
+            return [t for t in (p.get_text(strip=True) for p in soup.find_all("p")) if t]
         except Exception as e:
             logger.warning(f"URL 처리 중 오류 ({url}): {e}")
-        return snippets
+            # 실패한 URL도 빈 결과로 캐싱하여 같은 실행 안에서 재시도하지 않음
+            return []
+
+    def get_paragraphs(self, url: str) -> List[str]:
+        with self._lock:
+            self.requests += 1
+            cached = self._pages.get(url)
+        if cached is not None:
+            return cached
+        paragraphs = self._fetch_paragraphs(url)
+        with self._lock:
+            if url not in self._pages:
+                self.fetches += 1
+                self._pages[url] = paragraphs
+            return self._pages[url]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "fetches": self.fetches,
+                "saved": self.requests - self.fetches,
+                "unique_urls": len(self._pages),
+            }
+
+# (9) 콘텐츠 추출기 (병렬)
+class ContentExtractor:
+    def __init__(self, cache: Optional[PageCache] = None):
+        self.cache = cache or PageCache()
+
+    def extract_snippets(self, url: str, keywords: List[str]) -> List[str]:
+        paragraphs = self.cache.get_paragraphs(url)
+        return [text for text in paragraphs if any(kw in text for kw in keywords)]
 
     def extract_bulk(self, urls: List[str], keywords: List[str]) -> List[str]:
+        # 같은 검색 결과 안의 중복 URL 제거 (순서 유지)
+        unique_urls = list(dict.fromkeys(urls))
         snippets = []
         with ThreadPoolExecutor(max_workers=8) as executor:
-            futures = [executor.submit(self.extract_snippets, url, keywords) for url in urls]
+            futures = [executor.submit(self.extract_snippets, url, keywords) for url in unique_urls]
             for future in futures:
                 snippets.extend(future.result())
         return snippets
 
-# (9) 요약기
+# (10) 요약기
 class FeatureStructurer:
     def summarize(self, title: str, texts: List[str]) -> str:
         if not texts:
@@ -143,13 +180,14 @@ class FeatureStructurer:
             summary += "."
         return summary
 
-# (10) 시장성 평가
+# (11) 시장성 평가
 class MarketEvaluationAgent:
     def __init__(self):
         self.domain_cls = DomainClassifier()
         self.query_gen = QueryGenerator()
         self.retriever = WebRetriever(api_key=TAVILY_API_KEY)
-        self.extractor = ContentExtractor()
+        self.page_cache = PageCache()
+        self.extractor = ContentExtractor(cache=self.page_cache)
         self.structurer = FeatureStructurer()
 
     def evaluate(self, company: str) -> Dict[str, Any]:
@@ -170,14 +208,21 @@ class MarketEvaluationAgent:
         domain_analysis = analyze(self.query_gen.make_domain_queries(domain), [domain])
         company_analysis = analyze(self.query_gen.make_company_queries(comp_name), [comp_name])
 
+        stats = self.page_cache.stats()
+        logger.info(
+            f"[{comp_name}] 페이지 캐시: 요청 {stats['requests']}건, "
+            f"실제 fetch {stats['fetches']}건, 절약 {stats['saved']}건"
+        )
+
         return {
             "company": comp_name,
             "domain": domain,
             "domain_analysis": domain_analysis,
             "company_analysis": company_analysis,
+            "fetch_stats": stats,
         }
 
-# (11) 보고서 포맷 함수
+# (12) 보고서 포맷 함수
 def format_market_report(result: Dict[str, Any]) -> str:
     company_str = f"1. 기업: {result['company']}"
     domain_str = f"2. 도메인: {result['domain']}"
@@ -194,7 +239,7 @@ def format_market_report(result: Dict[str, Any]) -> str:
     )
     return report
 
-# (12) market_agent
+# (13) market_agent
 def market_agent(state: GraphState) -> GraphState:
     company = state.get("current_company")
     if not company:
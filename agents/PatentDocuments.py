@@ -0,0 +1,270 @@
+import os
+import glob
+import re
+import json
+import hashlib
+import logging
+import multiprocessing
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from PyPDF2 import PdfReader
+from agents.CacheStore import write_json_atomic
+
+# 특허 PDF 처리 모듈
+# - 프로세스 풀은 spawn 방식으로 시작하며, 워커가 가볍게 import 할 수 있도록 SBERT/Chroma 의존성을 두지 않음
+#   (spawn 워커는 부모의 __main__ 모듈도 다시 import 하므로 TechReportAgent의 모델/DB 초기화는 지연 로딩)
+
+logger = logging.getLogger(__name__)
+
+PATENT_PATTERN = re.compile(r"특허\s*\d+\s*:")
+PATENT_PREFIX = "특허"
+# 페이지 경계에 걸친 매치를 위해 다음 페이지로 넘기는 꼬리 문자열의 최대 길이
+MAX_CARRY_CHARS = 256
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "patent_counts.json")
+
+# 문장 경계: 문장부호 + 공백, 마침표 없이 줄바꿈으로 끝나는 한국어 종결어미, 빈 줄(문단 경계)
+SENTENCE_BOUNDARY = re.compile(
+    r"[.!?。？！…]+[\"'”’)\]]*\s+"
+    r"|(?<=[다요음함됨임])[ \t]*\n\s*"
+    r"|\n[ \t]*\n\s*"
+)
+DEFAULT_MAX_TOKENS = 256
+DEFAULT_OVERLAP_TOKENS = 32
+
+
+# PDF 페이지 스트리밍
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    reader = PdfReader(path)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def list_company_pdfs(company: str, base_dir: str = "data") -> List[str]:
+    return sorted(glob.glob(os.path.join(base_dir, company, "*.pdf")))
+
+
+# 페이지 단위 증분 카운트 (페이지 전체를 하나로 합치지 않음)
+def count_patents_in_pages(pages: Iterable[str]) -> int:
+    count, carry = 0, ""
+    for page in pages:
+        text = carry + page
+        last_end = 0
+        for m in PATENT_PATTERN.finditer(text):
+            count += 1
+            last_end = m.end()
+        # 아직 완성되지 않은 '특허 N' 또는 페이지 끝의 '특'은 다음 페이지와 이어서 검사
+        start = text.rfind(PATENT_PREFIX, last_end)
+        if start == -1 and text.endswith(PATENT_PREFIX[0]) and len(text) - 1 >= last_end:
+            start = len(text) - 1
+        carry = text[start:] if start != -1 else ""
+        if len(carry) > MAX_CARRY_CHARS:
+            carry = ""
+    return count
+
+
+# 페이지 스트림을 문장 단위로 분리 (페이지에 걸친 문장은 이어 붙임)
+def iter_sentences(pages: Iterable[str], max_pending_chars: int = 8000) -> Iterator[str]:
+    pending = ""
+    for page in pages:
+        pending = pending + "\n" + page if pending else page
+        start = 0
+        for m in SENTENCE_BOUNDARY.finditer(pending):
+            sent = pending[start:m.end()].strip()
+            if sent:
+                yield sent
+            start = m.end()
+        pending = pending[start:]
+        # 문장 경계가 오랫동안 없으면 강제로 내보내 메모리를 제한
+        if len(pending) > max_pending_chars:
+            sent = pending.strip()
+            if sent:
+                yield sent
+            pending = ""
+    sent = pending.strip()
+    if sent:
+        yield sent
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+# 문장이 max_tokens를 넘으면 단어 단위로 분할 (다음 조각 앞에 overlap을 붙일 수 있도록 조각 크기는 max_tokens - overlap_tokens)
+def _split_long_sentence(sent: str, piece_tokens: int, count_tokens: Callable[[str], int]) -> Iterator[Tuple[str, int]]:
+    words, total = [], 0
+    for word in sent.split():
+        t = count_tokens(word)
+        if words and total + t > piece_tokens:
+            yield " ".join(words), total
+            words, total = [], 0
+        words.append(word)
+        total += t
+    if words:
+        yield " ".join(words), total
+
+
+# 텍스트 끝에서 limit 토큰 이내의 단어들
+def _tail_words(text: str, limit: int, count_tokens: Callable[[str], int]) -> Tuple[str, int]:
+    words, total = [], 0
+    for word in reversed(text.split()):
+        t = count_tokens(word)
+        if total + t > limit:
+            break
+        words.append(word)
+        total += t
+    return " ".join(reversed(words)), total
+
+
+# 토큰 수 기준 청크 생성 (문장 단위 + overlap, 지연 생성)
+def iter_chunks(
+    pages: Iterable[str],
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    count_tokens: Callable[[str], int] = count_words,
+) -> Iterator[str]:
+    if overlap_tokens >= max_tokens:
+        raise ValueError("overlap_tokens는 max_tokens보다 작아야 합니다.")
+    buf: deque = deque()  # (문장, 토큰 수)
+    total, fresh = 0, False
+    for sent in iter_sentences(pages):
+        t = count_tokens(sent)
+        if t > max_tokens:
+            pieces = _split_long_sentence(sent, max_tokens - overlap_tokens, count_tokens)
+        else:
+            pieces = [(sent, t)]
+        for piece, t in pieces:
+            if buf and total + t > max_tokens:
+                if fresh:
+                    yield " ".join(s for s, _ in buf)
+                last = buf[-1][0]
+                # 다음 청크에 이어 붙일 overlap 문장만 남김
+                while buf and (total > overlap_tokens or total + t > max_tokens):
+                    total -= buf.popleft()[1]
+                # 마지막 문장이 overlap보다 길면 그 끝부분 단어들을 overlap으로 사용
+                if not buf and overlap_tokens > 0:
+                    tail, tail_t = _tail_words(last, overlap_tokens, count_tokens)
+                    if tail and tail_t + t <= max_tokens:
+                        buf.append((tail, tail_t))
+                        total = tail_t
+                fresh = False
+            buf.append((piece, t))
+            total += t
+            fresh = True
+    if buf and fresh:
+        yield " ".join(s for s, _ in buf)
+
+
+def iter_batches(items: Iterable, batch_size: int) -> Iterator[list]:
+    it = iter(items)
+    while True:
+        batch = list(islice(it, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# 캐시 키: 파일 내용 해시 + 카운트 정규식 (정규식이 바뀌면 이전 결과를 쓰지 않음)
+def count_cache_key(digest: str) -> str:
+    pattern_hash = hashlib.sha256(PATENT_PATTERN.pattern.encode("utf-8")).hexdigest()[:12]
+    return f"{digest}:{pattern_hash}"
+
+
+def _count_file(path: str) -> int:
+    return count_patents_in_pages(iter_pdf_pages(path))
+
+
+# 파일 내용 해시 기반 카운트 캐시
+class PatentCountCache:
+    def __init__(self, path: Optional[str] = DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = Lock()
+        self._counts: Dict[str, int] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self._counts = {k: int(v) for k, v in json.load(f).items()}
+            except (OSError, ValueError) as e:
+                logger.warning(f"특허 카운트 캐시 로드 실패 ({path}): {e}")
+
+    def get(self, digest: str) -> Optional[int]:
+        with self._lock:
+            return self._counts.get(count_cache_key(digest))
+
+    def put(self, digest: str, count: int):
+        with self._lock:
+            self._counts[count_cache_key(digest)] = count
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = dict(self._counts)
+        write_json_atomic(self.path, data)
+
+
+_default_cache: Optional[PatentCountCache] = None
+
+
+def get_default_count_cache() -> PatentCountCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PatentCountCache()
+    return _default_cache
+
+
+# 여러 기업 · 여러 PDF를 프로세스 풀에서 병렬 카운트
+def count_patents_bulk(
+    companies: List[str],
+    base_dir: str = "data",
+    max_workers: Optional[int] = None,
+    cache: Optional[PatentCountCache] = None,
+) -> Dict[str, int]:
+    cache = cache if cache is not None else get_default_count_cache()
+    counts = {company: 0 for company in companies}
+    pending: List[Tuple[str, str, str]] = []  # (company, path, digest)
+
+    for company in companies:
+        paths = list_company_pdfs(company, base_dir)
+        if not paths:
+            logger.warning(f"특허 PDF 없음: {os.path.join(base_dir, company)}")
+        for path in paths:
+            digest = file_sha256(path)
+            cached = cache.get(digest)
+            if cached is None:
+                pending.append((company, path, digest))
+            else:
+                counts[company] += cached
+
+    if pending:
+        paths = [path for _, path, _ in pending]
+        # 파일이 하나뿐이면 프로세스 생성 비용을 피해 현재 프로세스에서 처리
+        if len(paths) == 1:
+            results = [_count_file(paths[0])]
+        else:
+            # 호출 프로세스에 torch/chromadb 스레드가 떠 있으므로 fork 대신 spawn 사용
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx) as executor:
+                results = list(executor.map(_count_file, paths))
+        for (company, _, digest), count in zip(pending, results):
+            cache.put(digest, count)
+            counts[company] += count
+        cache.save()
+
+    return counts
+
+
+# PDF에서 특허 개수 세기 (기업 폴더의 모든 PDF 합산, PDF가 없으면 0)
+def count_patents_in_pdf(company: str, base_dir: str = "data") -> int:
+    return count_patents_bulk([company], base_dir=base_dir)[company]
@@ -0,0 +1,54 @@
+import os
+import time
+import logging
+from typing import Dict, List, Optional, TextIO
+
+# 스트리밍 출력 모드
+# - STREAM_OUTPUT=1 이면 보고서 생성 노드가 LLM 토큰을 받는 즉시 콘솔/파일에 출력
+# - 노드 실행마다 노드 시작부터 첫 토큰까지의 시간(TTFT)을 node_ttft에 한 번 기록
+
+logger = logging.getLogger(__name__)
+
+node_ttft: Dict[str, List[float]] = {}
+_node_started: Dict[str, float] = {}  # 아직 첫 토큰이 나오지 않은 노드 -> 시작 시각
+
+
+def begin_node(node: str):
+    _node_started[node] = time.perf_counter()
+
+
+def streaming_enabled() -> bool:
+    return os.getenv("STREAM_OUTPUT", "").strip().lower() in ("1", "true", "yes")
+
+
+def stream_completion(llm, prompt: str, node: str, sink: Optional[TextIO] = None, echo: bool = True) -> str:
+    parts = []
+    first_token = None
+    start = time.perf_counter()
+    for chunk in llm.stream(prompt):
+        text = chunk.content
+        if not text:
+            continue
+        if first_token is None:
+            first_token = time.perf_counter() - start
+            node_start = _node_started.pop(node, None)
+            if node_start is not None:
+                node_ttft.setdefault(node, []).append(time.perf_counter() - node_start)
+        parts.append(text)
+        if echo:
+            print(text, end="", flush=True)
+        if sink is not None:
+            sink.write(text)
+            sink.flush()
+    if echo:
+        print(flush=True)
+    logger.info(f"[{node}] 호출 첫 토큰 {first_token or 0.0:.2f}s, 전체 {time.perf_counter() - start:.2f}s")
+    return "".join(parts)
+
+
+def format_ttft_summary() -> str:
+    lines = ["노드별 TTFT (노드 시작부터 첫 토큰까지의 시간)"]
+    for node, values in node_ttft.items():
+        avg = sum(values) / len(values)
+        lines.append(f"- {node}: 평균 {avg:.2f}s, 최소 {min(values):.2f}s, 최대 {max(values):.2f}s ({len(values)}회)")
+    return "\n".join(lines)
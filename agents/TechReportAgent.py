@@ -1,18 +1,23 @@
 import os
-import glob
-import re
 import logging
+from typing import Optional
 from dotenv import load_dotenv
 from openai import OpenAI
 from tavily import TavilyClient
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor
 from requests import get
-from sentence_transformers import SentenceTransformer
-from chromadb import Client
-from chromadb.config import Settings
-from PyPDF2 import PdfReader
 from GraphState import GraphState
+from agents.EmbeddingService import BulkEmbedder, EmbeddingCache
+from agents.LexicalIndex import BM25Index, adaptive_cutoff, normalize_scores, reciprocal_rank_fusion
+from agents.PatentDocuments import (
+    DEFAULT_OVERLAP_TOKENS,
+    count_patents_in_pdf,
+    iter_batches,
+    iter_chunks,
+    iter_pdf_pages,
+    list_company_pdfs,
+)
 
 # 환경변수 로드
 load_dotenv()
@@ -25,50 +30,128 @@ logging.getLogger("chromadb.telemetry").setLevel(logging.CRITICAL)
 
 # 클라이언트 초기화
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
-# SBERT 모델 로드
-sbert_model = SentenceTransformer('all-MiniLM-L6-v2')
+# SBERT 모델 / 임베딩 캐시 / ChromaDB / BM25 인덱스는 처음 사용할 때 초기화
+# (spawn 워커 프로세스가 이 모듈을 import 할 때 모델 로드나 캐시 파일 정리가 일어나지 않도록 함)
+SBERT_MODEL_NAME = 'all-MiniLM-L6-v2'
+_sbert_model = None
+_embedding_cache: Optional[EmbeddingCache] = None
+_query_embedder: Optional[BulkEmbedder] = None
+_patent_index = None
+_lexical_index: Optional[BM25Index] = None
 
-# ChromaDB 설정
-settings = Settings(
-    anonymized_telemetry=True,
-    persist_directory="chromadb_tech_eval"
-)
-chroma = Client(settings)
-# 컬렉션
-patent_index = chroma.get_or_create_collection("patent_embeddings_sbert")
+def get_sbert():
+    global _sbert_model
+    if _sbert_model is None:
+        from sentence_transformers import SentenceTransformer
+        _sbert_model = SentenceTransformer(SBERT_MODEL_NAME)
+    return _sbert_model
+
+# 청크 크기는 SBERT 토크나이저 기준, 모델 최대 입력 길이([CLS]/[SEP] 제외)에 맞춤
+def sbert_max_tokens() -> int:
+    return get_sbert().max_seq_length - 2
+
+def sbert_token_count(text: str) -> int:
+    return len(get_sbert().tokenizer.tokenize(text))
+
+# 쿼리/인덱싱 공용 임베딩 캐시 (텍스트 해시 -> 벡터)
+def get_embedding_cache() -> EmbeddingCache:
+    global _embedding_cache
+    if _embedding_cache is None:
+        _embedding_cache = EmbeddingCache(SBERT_MODEL_NAME, get_sbert().get_sentence_embedding_dimension())
+    return _embedding_cache
+
+def get_query_embedder() -> BulkEmbedder:
+    global _query_embedder
+    if _query_embedder is None:
+        _query_embedder = BulkEmbedder(get_sbert(), workers=1, cache=get_embedding_cache())
+    return _query_embedder
+
+# ChromaDB 컬렉션
+def get_patent_index():
+    global _patent_index
+    if _patent_index is None:
+        from chromadb import Client
+        from chromadb.config import Settings
+        settings = Settings(
+            anonymized_telemetry=True,
+            persist_directory="chromadb_tech_eval"
+        )
+        chroma = Client(settings)
+        _patent_index = chroma.get_or_create_collection("patent_embeddings_sbert")
+    return _patent_index
+
+# 특허 청크 BM25 역색인 (적재 시 Chroma와 같은 id로 함께 구축)
+def get_lexical_index() -> BM25Index:
+    global _lexical_index
+    if _lexical_index is None:
+        _lexical_index = BM25Index()
+    return _lexical_index
 
 # 데이터 처리 함수
-def chunk_text(text: str, max_chars: int = 2000) -> list[str]:
-    sentences = re.split(r'(?<=[\.!?])\s+', text)
-    chunks, current = [], ""
-    for sent in sentences:
-        if len(current) + len(sent) <= max_chars:
-            current = current + " " + sent if current else sent
-        else:
-            chunks.append(current)
-            current = sent
-    if current:
-        chunks.append(current)
-    return chunks
-
-# 인덱싱 함수
-def index_patents(patent_texts: list[str], patent_ids: list[str], company: str):
-    vectors = sbert_model.encode(patent_texts).tolist()
+def chunk_text(text: str, max_tokens: Optional[int] = None, overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> list[str]:
+    max_tokens = max_tokens or sbert_max_tokens()
+    return list(iter_chunks([text], max_tokens=max_tokens, overlap_tokens=overlap_tokens, count_tokens=sbert_token_count))
+
+# 인덱싱 함수 (float32 배열을 그대로 Chroma에 전달)
+def index_patents(patent_texts: list[str], patent_ids: list[str], company: str, embeddings=None):
+    if embeddings is None:
+        embeddings = get_query_embedder().encode(patent_texts)
     metadatas = [{"company": company} for _ in patent_texts]
-    patent_index.add(
+    get_patent_index().add(
         documents=patent_texts,
-        embeddings=vectors,
+        embeddings=embeddings,
         ids=patent_ids,
         metadatas=metadatas
     )
 
-# PDF에서 특허 개수 세기
-def count_patents_in_pdf(company: str, base_dir: str = "data") -> int:
-    path = glob.glob(os.path.join(base_dir, company, "*.pdf"))[0]
-    reader = PdfReader(path)
-    full_text = "".join(page.extract_text() or "" for page in reader.pages)
-    matches = re.findall(r"특허\s*\d+\s*:", full_text)
-    return len(matches)
+# 특허 PDF 적재: 페이지 스트림 -> 청크 -> 고정 크기 배치 임베딩 -> Chroma (메모리 사용량을 배치 크기로 제한)
+def ingest_company_patents(
+    company: str,
+    base_dir: str = "data",
+    batch_size: int = 256,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    embedder: Optional[BulkEmbedder] = None,
+    save_lexical: bool = True,
+) -> int:
+    embedder = embedder or get_query_embedder()
+    max_tokens = max_tokens or sbert_max_tokens()
+    lexical_index = get_lexical_index()
+    # 이전 적재 결과를 지우고 다시 적재 (id가 기업/파일/순번이므로 PDF가 바뀌면 옛 청크가 남음)
+    get_patent_index().delete(where={"company": company})
+    removed = lexical_index.remove_company(company)
+    if removed:
+        logging.info(f"[{company}] 기존 BM25 청크 {removed}개 제거")
+    total = 0
+    for path in list_company_pdfs(company, base_dir):
+        name = os.path.splitext(os.path.basename(path))[0]
+        chunks = iter_chunks(iter_pdf_pages(path), max_tokens=max_tokens, overlap_tokens=overlap_tokens,
+                             count_tokens=sbert_token_count)
+        for batch in iter_batches(chunks, batch_size):
+            ids = [f"{company}-{name}-{total + i}" for i in range(len(batch))]
+            index_patents(batch, ids, company, embeddings=embedder.encode(batch))
+            lexical_index.add(ids, batch, company)
+            total += len(batch)
+    if save_lexical:
+        lexical_index.save()
+    logging.info(f"[{company}] 특허 청크 {total}개 인덱싱 완료")
+    return total
+
+# 전체 재인덱싱: 하나의 멀티프로세스 풀을 모든 기업에 재사용
+def reindex_all_patents(companies: list[str], base_dir: str = "data", workers: Optional[int] = None, batch_size: int = 256) -> dict:
+    with BulkEmbedder(get_sbert(), workers=workers, cache=get_embedding_cache()) as embedder:
+        counts = {
+            c: ingest_company_patents(c, base_dir, batch_size=batch_size, embedder=embedder, save_lexical=False)
+            for c in companies
+        }
+    # BM25 인덱스 전체를 다시 직렬화하므로 기업마다가 아니라 마지막에 한 번만 저장
+    get_lexical_index().save()
+    stats = embedder.stats()
+    logging.info(
+        f"재인덱싱 완료: 청크 {stats['docs']}개 (캐시 적중 {stats['cache_hits']}개), "
+        f"인코딩 {stats['encoded']}개 / {stats['seconds']}s = {stats['docs_per_sec']} docs/sec"
+    )
+    return {"counts": counts, **stats}
 
 # 쿼리 생성기
 class QueryGenerator:
@@ -124,32 +207,64 @@ class HierarchicalSummarizer:
         final = resp.choices[0].message.content.strip()
         return final if final.endswith('.') else final + '.'
 
+# 하이브리드 검색기: Chroma 벡터 검색 + BM25 결과를 RRF로 결합 후 적응형 컷오프
+class HybridRetriever:
+    def __init__(self, vector_index=None, lexical: Optional[BM25Index] = None,
+                 cutoff_ratio: float = 0.5, min_results: int = 5, max_results: int = 20):
+        self.vector_index = vector_index if vector_index is not None else get_patent_index()
+        self.lexical = lexical if lexical is not None else get_lexical_index()
+        self.cutoff_ratio = cutoff_ratio
+        self.min_results = min_results
+        self.max_results = max_results
+
+    def retrieve(self, query: str, company: str, n_candidates: int = 50) -> list[str]:
+        res = self.vector_index.query(
+            query_embeddings=get_query_embedder().encode([query]),
+            n_results=n_candidates,
+            where={"company": company}
+        )
+        vector_ids = res["ids"][0]
+        texts = dict(zip(vector_ids, res["documents"][0]))
+        # 거리는 작을수록 관련도가 높으므로 부호를 뒤집어 점수로 사용
+        scored_lists = [list(zip(vector_ids, [-d for d in res["distances"][0]]))]
+        if self.lexical.has_company(company):
+            lexical_hits = self.lexical.search(query, k=n_candidates, company=company)
+            scored_lists.append(lexical_hits)
+            for doc_id, _ in lexical_hits:
+                texts.setdefault(doc_id, self.lexical.text(doc_id))
+        else:
+            logging.info(f"[{company}] BM25 인덱스 없음, 벡터 검색 결과만 사용")
+        relevance: dict = {}
+        for scored in scored_lists:
+            for doc_id, score in normalize_scores(scored).items():
+                relevance[doc_id] = max(relevance.get(doc_id, 0.0), score)
+        selected = adaptive_cutoff(
+            reciprocal_rank_fusion([[doc_id for doc_id, _ in scored] for scored in scored_lists]),
+            relevance,
+            cutoff_ratio=self.cutoff_ratio,
+            min_results=self.min_results,
+            max_results=self.max_results,
+        )
+        logging.info(f"[{company}] '{query}' 검색: 후보 {len(texts)}개 -> {len(selected)}개 선택")
+        return [texts[doc_id] for doc_id in selected]
+
 # 통합 평가기
 class IntegratedEvaluator:
     def __init__(self):
         self.qgen = QueryGenerator()
         self.structurer = FeatureStructurer()
         self.hier = HierarchicalSummarizer(self.structurer)
-        self.patent_idx = patent_index
+        self.retriever = HybridRetriever()
     def evaluate(self, company: str, n_results: int = 50, batch_size: int = 5) -> dict:
         actual_count = count_patents_in_pdf(company)
-        emb = sbert_model.encode([f"{company} 기술 OR 특허"]).tolist()
-        patent_snips = self.patent_idx.query(
-            query_embeddings=emb,
-            n_results=n_results,
-            where={"company": company}
-        )["documents"][0]
+        patent_snips = self.retriever.retrieve(f"{company} 기술 OR 특허", company, n_candidates=n_results)
         tech_analysis = {}
         for q in self.qgen.tech_queries(company):
-            emb_q = sbert_model.encode([q]).tolist()
-            snips = self.patent_idx.query(
-                query_embeddings=emb_q,
-                n_results=n_results,
-                where={"company": company}
-            )["documents"][0]
+            snips = self.retriever.retrieve(q, company, n_candidates=n_results)
             tech_analysis[q] = self.hier.summarize(q, snips, batch_size)
         combined = patent_snips + [s for s in tech_analysis.values()]
         summary = self.hier.summarize(f"{company} 기술력", combined, batch_size)
+        logging.info(f"[{company}] 임베딩 캐시: {get_embedding_cache().stats()}")
         return {
             "company": company,
             "patent_count": actual_count,
@@ -168,4 +283,21 @@ def tech_agent(state: GraphState) -> GraphState:
         **state,
         "tech_report": result["summary"]
         # "tech_detail": result["tech_analysis"]   # 키워드별 상세 분석
-    }
\ No newline at end of file
+    }
+
+# 전체 재인덱싱 실행: python -m agents.TechReportAgent [기업 폴더명 ...] [--workers N]
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="특허 PDF 전체 재인덱싱 (SBERT 멀티프로세스 + Chroma/BM25)")
+    parser.add_argument("companies", nargs="*", help="data/ 아래 기업 폴더명 (생략 시 전체)")
+    parser.add_argument("--base-dir", default="data")
+    parser.add_argument("--workers", type=int, default=None, help="CPU 워커 수 (기본: 전체 코어)")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    companies = args.companies or sorted(
+        d for d in os.listdir(args.base_dir) if os.path.isdir(os.path.join(args.base_dir, d))
+    )
+    result = reindex_all_patents(companies, base_dir=args.base_dir, workers=args.workers, batch_size=args.batch_size)
+    print(result)
@@ -0,0 +1,147 @@
+"""
+대용량 합성 특허 PDF로 특허 카운트 성능 측정
+
+기존 방식(전체 페이지 문자열 결합 후 정규식) 대비
+- 페이지 스트리밍 + 프로세스 풀 (캐시 없음)
+- 내용 해시 캐시 적중 시
+의 소요 시간을 비교합니다.
+
+실행: python -m benchmarks.bench_patent_count --companies 4 --pdfs 2 --pages 300
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyPDF2 import PdfReader
+from agents.PatentDocuments import PatentCountCache, count_patents_bulk, list_company_pdfs
+
+LINES_PER_PAGE = 40
+
+
+# 최소 PDF 작성기: Type0(Identity-H) 폰트 + ToUnicode CMap으로 한글 텍스트 추출이 가능하도록 구성
+def write_synthetic_pdf(path: str, pages: List[List[str]]):
+    chars = sorted({ch for lines in pages for line in lines for ch in line})
+    bfchar = "\n".join(f"<{ord(ch):04X}> <{ord(ch):04X}>" for ch in chars)
+    cmap = (
+        "/CIDInit /ProcSet findresource begin 12 dict begin begincmap\n"
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def\n"
+        "/CMapName /Adobe-Identity-UCS def /CMapType 2 def\n"
+        "1 begincodespacerange <0000> <FFFF> endcodespacerange\n"
+        f"{len(chars)} beginbfchar\n{bfchar}\nendbfchar\n"
+        "endcmap CMapName currentdict /CMap defineresource pop end end"
+    )
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Pages (페이지 목록 확정 후 채움)
+        b"<< /Type /Font /Subtype /Type0 /BaseFont /Synthetic /Encoding /Identity-H "
+        b"/DescendantFonts [4 0 R] /ToUnicode 5 0 R >>",
+        b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /Synthetic "
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+        b"/FontDescriptor 6 0 R /DW 1000 >>",
+        _stream(cmap.encode("ascii")),
+        b"<< /Type /FontDescriptor /FontName /Synthetic /Flags 4 "
+        b"/FontBBox [0 0 1000 1000] /ItalicAngle 0 /Ascent 1000 /Descent 0 /CapHeight 1000 /StemV 80 >>",
+    ]
+    page_ids = []
+    for lines in pages:
+        ops = ["BT /F1 10 Tf 12 TL 40 800 Td"]
+        for line in lines:
+            ops.append("<" + "".join(f"{ord(ch):04X}" for ch in line) + "> Tj T*")
+        ops.append("ET")
+        objects.append(_stream("\n".join(ops).encode("ascii")))
+        content_id = len(objects)
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>".encode("ascii")
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{i} 0 R" for i in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode("ascii")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode("ascii") + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("ascii")
+    for off in offsets:
+        out += f"{off:010d} 00000 n \n".encode("ascii")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("ascii")
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+def _stream(data: bytes) -> bytes:
+    return f"<< /Length {len(data)} >>\nstream\n".encode("ascii") + data + b"\nendstream"
+
+
+def make_pages(n_pages: int, seed: int) -> List[List[str]]:
+    pages, patent_no = [], seed * 100000
+    for p in range(n_pages):
+        lines = []
+        for i in range(LINES_PER_PAGE):
+            if i % 10 == 0:
+                patent_no += 1
+                lines.append(f"특허 {patent_no}: 딥러닝 기반 영상 분석 장치 및 방법")
+            else:
+                lines.append(f"청구항 {i}. 입력 데이터를 전처리하여 특징 벡터를 추출하는 단계를 포함한다 {p}")
+        pages.append(lines)
+    return pages
+
+
+def baseline_count(company: str, base_dir: str) -> int:
+    # 기존 구현: 첫 번째 PDF만, 전체 텍스트 결합 후 정규식
+    path = list_company_pdfs(company, base_dir)[0]
+    reader = PdfReader(path)
+    full_text = "".join(page.extract_text() or "" for page in reader.pages)
+    return len(re.findall(r"특허\s*\d+\s*:", full_text))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--companies", type=int, default=4)
+    parser.add_argument("--pdfs", type=int, default=2)
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_dir:
+        companies = [f"COMPANY_{i}" for i in range(args.companies)]
+        for ci, company in enumerate(companies):
+            os.makedirs(os.path.join(base_dir, company))
+            for pi in range(args.pdfs):
+                path = os.path.join(base_dir, company, f"{company}_{pi}.pdf")
+                write_synthetic_pdf(path, make_pages(args.pages, ci * args.pdfs + pi))
+        total_pages = args.companies * args.pdfs * args.pages
+        print(f"합성 PDF: 기업 {args.companies}개 x PDF {args.pdfs}개 x {args.pages}페이지 = {total_pages}페이지")
+
+        start = time.perf_counter()
+        baseline = {c: baseline_count(c, base_dir) for c in companies}
+        t_base = time.perf_counter() - start
+        print(f"기존 방식 (첫 PDF만, 전체 결합): {t_base:.2f}s  {baseline}")
+
+        cache = PatentCountCache(os.path.join(base_dir, "patent_counts.json"))
+        start = time.perf_counter()
+        cold = count_patents_bulk(companies, base_dir, max_workers=args.workers, cache=cache)
+        t_cold = time.perf_counter() - start
+        print(f"스트리밍 + 프로세스 풀 (모든 PDF, 캐시 없음): {t_cold:.2f}s  {cold}")
+
+        start = time.perf_counter()
+        warm = count_patents_bulk(companies, base_dir, cache=PatentCountCache(cache.path))
+        t_warm = time.perf_counter() - start
+        print(f"해시 캐시 적중: {t_warm:.3f}s  {warm}")
+
+        expected = args.pdfs * args.pages * (LINES_PER_PAGE // 10)
+        assert all(v == expected for v in cold.values()) and cold == warm, "카운트 불일치"
+
+
+if __name__ == "__main__":
+    main()
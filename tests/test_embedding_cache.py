@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+
+from agents.EmbeddingService import EmbeddingCache
+
+DIM = 4
+
+
+def fake_encode(texts):
+    return np.array([[len(t), ord(t[0]), 0, 1] for t in texts], dtype=np.float32)
+
+
+def make_cache(tmp_path):
+    return EmbeddingCache("test-model", DIM, cache_dir=str(tmp_path))
+
+
+def test_reload_returns_cached_vectors(tmp_path):
+    make_cache(tmp_path).encode(["ab", "cde"], fake_encode)
+    cache = make_cache(tmp_path)
+    out = cache.encode(["cde", "ab"], fake_encode)
+    np.testing.assert_array_equal(out, fake_encode(["cde", "ab"]))
+    assert cache.stats()["encoded"] == 0
+
+
+def test_orphan_vectors_without_hashes_file_are_dropped(tmp_path):
+    # 첫 append 도중 vectors.f32만 기록되고 hashes.txt는 생기지 않은 경우
+    cache = make_cache(tmp_path)
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.full((3, DIM), 9, dtype=np.float32).tobytes())
+    make_cache(tmp_path).encode(["ab"], fake_encode)
+    out = make_cache(tmp_path).encode(["ab"], fake_encode)
+    np.testing.assert_array_equal(out, fake_encode(["ab"]))
+
+
+def test_hashes_without_vectors_file_are_dropped(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.encode(["xy", "zw"], fake_encode)
+    os.remove(cache.vectors_path)
+    make_cache(tmp_path).encode(["ab"], fake_encode)
+    cache = make_cache(tmp_path)
+    np.testing.assert_array_equal(cache.encode(["ab"], fake_encode), fake_encode(["ab"]))
+    assert cache.stats()["encoded"] == 0
+
+
+def test_orphan_hash_line_and_partial_row_are_trimmed(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.encode(["ab"], fake_encode)
+    with open(cache.hashes_path, "a", encoding="utf-8") as f:
+        f.write("deadbeef\n")
+    make_cache(tmp_path).encode(["cde"], fake_encode)
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.zeros(DIM - 1, dtype=np.float32).tobytes())
+    make_cache(tmp_path).encode(["fgh"], fake_encode)
+    cache = make_cache(tmp_path)
+    texts = ["ab", "cde", "fgh"]
+    np.testing.assert_array_equal(cache.encode(texts, fake_encode), fake_encode(texts))
+    assert cache.stats()["encoded"] == 0
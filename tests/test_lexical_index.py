@@ -0,0 +1,18 @@
+from agents.LexicalIndex import BM25Index
+
+
+def test_remove_company_drops_stale_chunks():
+    index = BM25Index(path=None)
+    index.add(["U-a-0", "U-a-1"], ["문서 인식 기술", "영상 분석 장치"], "U")
+    index.add(["N-a-0"], ["문서 요약 모델"], "N")
+
+    assert index.remove_company("U") == 2
+    assert not index.has_company("U")
+    assert index.search("문서 인식", company="U") == []
+    assert [doc_id for doc_id, _ in index.search("문서")] == ["N-a-0"]
+
+    # 같은 id로 다시 적재하면 새 텍스트가 사용됨
+    index.add(["U-a-0"], ["음성 합성 특허"], "U")
+    assert index.text("U-a-0") == "음성 합성 특허"
+    assert [doc_id for doc_id, _ in index.search("음성", company="U")] == ["U-a-0"]
+    assert index.total_len == sum(length for _, _, length in index.docs.values())